@@ -4,34 +4,60 @@ SRT Subtitle Interpreter - Simple Command Line Interface
 Run an SRT file through our interpreter!
 """
 
+import argparse
 import sys
-from src.interpreter import SRTInterpreter
+
+from src.defaults import DEFAULT_WORKERS, MAX_CHUNK_TEXTS
+
+
+EXAMPLES = """Examples:
+  python main.py examples/valid_basic.srt
+  python main.py examples/valid_basic.srt filipino
+  python main.py examples/valid_basic.srt korean --workers 4
+  python main.py examples/valid_basic.srt japanese --chunk-size 10
+  python main.py examples/valid_basic.srt --quiet
+
+Supported languages: english, filipino, korean, chinese, japanese"""
 
 
 def main():
     """Main function - run the interpreter"""
+    parser = argparse.ArgumentParser(
+        usage="python main.py <srt_file> [language] [--workers N] [--chunk-size N] [--quiet]",
+        epilog=EXAMPLES,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("srt_file", help="the .srt file to run")
+    parser.add_argument("language", nargs="?", default="english",
+                        help="language to translate to (default: english)")
+    parser.add_argument("--workers", type=int,
+                        help=f"translation requests to send at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--chunk-size", type=int,
+                        help=f"subtitle lines packed into one request (default: {MAX_CHUNK_TEXTS})")
+    parser.add_argument("--quiet", action="store_true",
+                        help="only show the subtitles (and any errors)")
 
     # Check if user provided a file
     if len(sys.argv) < 2:
-        print("Usage: python main.py <srt_file> [language]")
-        print("\nExamples:")
-        print("  python main.py examples/valid_basic.srt")
-        print("  python main.py examples/valid_basic.srt filipino")
-        print("  python main.py examples/valid_basic.srt korean")
-        print("\nSupported languages: english, filipino, korean, chinese, japanese")
+        parser.print_help()
         return
 
-    # Get the filename from command line
-    filename = sys.argv[1]
+    args = parser.parse_args()
 
-    # Get the language if provided (default to english)
-    language = 'english'
-    if len(sys.argv) >= 3:
-        language = sys.argv[2]
+    # Only load the interpreter (and its translator) once we know we need it,
+    # so showing usage or bad-argument errors stays fast
+    from src.interpreter import SRTInterpreter
 
-    # Create and run the interpreter
-    interpreter = SRTInterpreter()
-    interpreter.run(filename, language)
+    # Create and run the interpreter (only passing the options that were given)
+    options = {}
+    if args.workers is not None:
+        options['workers'] = args.workers
+    if args.chunk_size is not None:
+        options['chunk_size'] = args.chunk_size
+    if args.quiet:
+        options['verbose'] = False
+    interpreter = SRTInterpreter(**options)
+    interpreter.run(args.srt_file, args.language)
 
 
 if __name__ == "__main__":
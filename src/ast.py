@@ -3,50 +3,88 @@ Data structures for the SRT subtitle interpreter.
 Contains all the classes and constants we need.
 """
 
+import re
+import sys
+from enum import IntEnum
+
+
+class TokenType(IntEnum):
+    """What kind of token we found (small ints are fast to compare)"""
+    INDEX = 0
+    TIMESTAMP = 1
+    ARROW = 2
+    TEXT = 3
+    BLANK_LINE = 4
+    EOF = 5
+
+    def __str__(self):
+        """Print as the name ("TEXT"), like the old string constants did"""
+        return self.name
+
+
 # Token type constants - these tell us what kind of token we found
-TOKEN_INDEX = "INDEX"
-TOKEN_TIMESTAMP = "TIMESTAMP"
-TOKEN_ARROW = "ARROW"
-TOKEN_TEXT = "TEXT"
-TOKEN_NEWLINE = "NEWLINE"
-TOKEN_BLANK_LINE = "BLANK_LINE"
-TOKEN_EOF = "EOF"
+TOKEN_INDEX = TokenType.INDEX
+TOKEN_TIMESTAMP = TokenType.TIMESTAMP
+TOKEN_ARROW = TokenType.ARROW
+TOKEN_TEXT = TokenType.TEXT
+TOKEN_BLANK_LINE = TokenType.BLANK_LINE
+TOKEN_EOF = TokenType.EOF
+
+# Pattern for a timestamp like 00:01:30,500 (one group per number)
+_TIMESTAMP_RE = re.compile(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})$')
 
 
 class Token:
     """A single piece of the SRT file (like a word in a sentence)"""
 
+    # __slots__ drops the per-instance __dict__ (there is one Token per line)
+    __slots__ = ('type', 'value', 'line_number')
+
     def __init__(self, type, value, line_number=0):
         self.type = type  # what kind of token is this?
         self.value = value  # the actual text
         self.line_number = line_number  # which line in the file?
 
     def __repr__(self):
-        return f"Token({self.type}, '{self.value}')"
+        return f"Token({self.type.name}, '{self.value}')"
 
 
 class TimeStamp:
     """Represents a time like 00:01:30,500 (1 minute 30.5 seconds)"""
 
+    __slots__ = ('hours', 'minutes', 'seconds', 'milliseconds', '_total_ms', '_str', '_display')
+
     def __init__(self, hours, minutes, seconds, milliseconds):
         self.hours = hours
         self.minutes = minutes
         self.seconds = seconds
         self.milliseconds = milliseconds
 
+        # Work out the total once, since times get compared a lot
+        # (treat a TimeStamp as read-only after it is created)
+        total = 0
+        total += hours * 3600000  # hours to ms
+        total += minutes * 60000  # minutes to ms
+        total += seconds * 1000  # seconds to ms
+        total += milliseconds
+        self._total_ms = total
+        self._str = None  # filled in the first time __str__ is called
+        self._display = None  # filled in the first time to_display is called
+
+    @staticmethod
     def from_string(timestamp_str):
         """Convert a string like '00:01:30,500' into a TimeStamp object"""
-        # Split by comma to get seconds and milliseconds
-        time_part, ms_part = timestamp_str.split(',')
-
-        # Split by colon to get hours, minutes, seconds
-        hours_str, minutes_str, seconds_str = time_part.split(':')
+        # One regex match gives us all four numbers (no split() lists)
+        match = _TIMESTAMP_RE.match(timestamp_str)
+        if not match:
+            raise ValueError(f"Invalid time: {timestamp_str}")
 
-        # Convert strings to numbers
-        hours = int(hours_str)
-        minutes = int(minutes_str)
-        seconds = int(seconds_str)
-        milliseconds = int(ms_part)
+        # Convert strings to numbers (groups() hands back all four at once)
+        hours, minutes, seconds, milliseconds = match.groups()
+        hours = int(hours)
+        minutes = int(minutes)
+        seconds = int(seconds)
+        milliseconds = int(milliseconds)
 
         # Check if the values make sense
         if minutes > 59 or seconds > 59 or milliseconds > 999:
@@ -56,30 +94,41 @@ class TimeStamp:
 
     def to_milliseconds(self):
         """Convert the time to total milliseconds (easier to compare)"""
-        total = 0
-        total += self.hours * 3600000  # hours to ms
-        total += self.minutes * 60000  # minutes to ms
-        total += self.seconds * 1000  # seconds to ms
-        total += self.milliseconds
-        return total
+        return self._total_ms
 
     def __str__(self):
         """Convert back to string format like 00:01:30,500"""
-        return f"{self.hours:02d}:{self.minutes:02d}:{self.seconds:02d},{self.milliseconds:03d}"
+        # Only format once, then reuse the same string
+        if self._str is None:
+            self._str = "%02d:%02d:%02d,%03d" % (self.hours, self.minutes, self.seconds, self.milliseconds)
+        return self._str
+
+    def to_display(self):
+        """Display format like 00:01:30.500 (a dot instead of a comma)"""
+        # Only format once, then reuse the same string
+        if self._display is None:
+            self._display = "%02d:%02d:%02d.%03d" % (self.hours, self.minutes, self.seconds, self.milliseconds)
+        return self._display
 
     def is_before(self, other):
         """Check if this time comes before another time"""
-        return self.to_milliseconds() < other.to_milliseconds()
+        return self._total_ms < other._total_ms
 
 
 class SubtitleEntry:
     """One subtitle with its index, timing, and text"""
 
+    __slots__ = ('index', 'start_time', 'end_time', 'text', '_joined')
+
     def __init__(self, index, start_time, end_time, text):
         self.index = index  # the number (1, 2, 3, ...)
         self.start_time = start_time  # when to show it
         self.end_time = end_time  # when to hide it
-        self.text = text  # list of text lines
+
+        # list of text lines (interned, so repeated lines like "[Music]"
+        # share one string; treat the list as read-only after this)
+        self.text = [sys.intern(line) for line in text]
+        self._joined = '\n'.join(self.text)  # get_text() is called a lot
 
     def validate(self):
         """Make sure this subtitle makes sense"""
@@ -91,13 +140,15 @@ class SubtitleEntry:
         if not self.start_time.is_before(self.end_time):
             raise ValueError(f"Start time must be before end time for subtitle {self.index}")
 
-        # Should have some text
-        if not self.text or all(line.strip() == '' for line in self.text):
-            raise ValueError(f"Subtitle {self.index} has no text")
+        # Should have some text (isspace() checks without making a new string)
+        for line in self.text:
+            if line and not line.isspace():
+                return
+        raise ValueError(f"Subtitle {self.index} has no text")
 
     def get_text(self):
         """Get all the text as one string"""
-        return '\n'.join(self.text)
+        return self._joined
 
     def __str__(self):
         """Show a summary of this subtitle"""
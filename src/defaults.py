@@ -0,0 +1,11 @@
+"""
+Default settings shared by the translator and the command line.
+Kept in their own module so main.py can show them without
+loading the translation library.
+"""
+
+# Most texts packed into one request by default (smaller groups spread better over workers)
+MAX_CHUNK_TEXTS = 20
+
+# How many requests can be in flight at once
+DEFAULT_WORKERS = 8
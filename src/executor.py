@@ -3,7 +3,22 @@ Executor - displays the subtitles and handles translation.
 This is where the subtitles actually get shown.
 """
 
+import sys
 import time
+from src.ast import SubtitleEntry
+from src.translator import Translator, TranslatorError, DEFAULT_WORKERS, MAX_CHUNK_TEXTS, NO_TRANSLATION
+from src.translator import PASSTHROUGH_PATTERNS
+from src.translation_cache import TranslationCache
+
+
+# How long each DISPLAY and each CLEAR stays on screen (seconds)
+PAUSE = 0.5
+
+# Shortest time between two progress line updates (seconds)
+PROGRESS_INTERVAL = 0.05
+
+# About how many lines iter_translated sends together
+STREAM_BATCH_LINES = 200
 
 
 class ExecutorError(Exception):
@@ -14,104 +29,202 @@ class ExecutorError(Exception):
 class Executor:
     """Displays subtitles one by one"""
 
-    def execute(self, entries, translate_to=None):
+    def __init__(self, workers=DEFAULT_WORKERS, chunk_size=MAX_CHUNK_TEXTS, verbose=True,
+                 passthrough_patterns=PASSTHROUGH_PATTERNS):
+        """
+        Set up the executor.
+
+        Args:
+            workers: How many translation requests to send at the same time
+            chunk_size: Most subtitle lines to pack into one translation request
+            verbose: Print the translation progress lines (subtitles and
+                     warnings are always shown)
+            passthrough_patterns: Compiled regexes for whole lines to keep untranslated
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.passthrough_patterns = passthrough_patterns
+        self.verbose = verbose
+        self.translators = {}  # language name -> Translator, reused between runs
+        self.disk_cache = None  # opened the first time we translate
+        self.last_progress = 0.0  # when the progress line was last drawn
+
+    def execute(self, entries, translate_to=None, out=None):
         """
         Display all the subtitles.
 
         Args:
-            entries: List of SubtitleEntry objects
+            entries: List of SubtitleEntry objects (or any iterable of them
+                     when not translating, so they can be shown as they are parsed)
             translate_to: Language to translate to (e.g., 'filipino', 'korean')
                          If None, shows original English text
+            out: Stream to write output to (default: sys.stdout)
         """
-        if not entries:
-            raise ExecutorError("No subtitles to display")
-
         # Translate if requested
-        if translate_to and translate_to.lower() != 'english':
-            print(f"\nTranslating to {translate_to}...")
-            entries = self.translate_subtitles(entries, translate_to)
-            print("Translation complete!                    \n")  # Extra spaces clear progress line
+        if translate_to and translate_to.lower() not in NO_TRANSLATION:
+            self.report(f"\nTranslating to {translate_to}...", out)
+            entries = self.translate_subtitles(entries, translate_to, out=out)
+            self.report("Translation complete!                    \n", out)  # Extra spaces clear progress line
+
+        # Write straight to the stream: one write() per line, then flush
+        # before each pause so the line is on screen while we wait
+        stream = out if out is not None else sys.stdout
+
+        # Pauses are timed from one fixed starting point, so time spent
+        # printing doesn't add up into drift
+        deadline = time.perf_counter()
+
+        # Counted as we go, since a generator can't tell us up front if it's empty
+        shown = 0
 
         # Display each subtitle
         for entry in entries:
+            # If this entry came late (like waiting for its group to be
+            # translated), start timing again from now instead of rushing
+            # through the pauses that were missed
+            deadline = max(deadline, time.perf_counter())
+            shown += 1
+
             # Show the subtitle
             start_time = self.format_time(entry.start_time)
             text = entry.get_text()
-            print(f"[{start_time}] DISPLAY: \"{text}\"")
+            stream.write(f"[{start_time}] DISPLAY: \"{text}\"\n")
+            stream.flush()
 
             # Pause briefly
-            time.sleep(0.5)
+            deadline += PAUSE
+            self.wait_until(deadline)
 
             # Clear the subtitle
             end_time = self.format_time(entry.end_time)
-            print(f"[{end_time}] CLEAR")
+            stream.write(f"[{end_time}] CLEAR\n")
+            stream.flush()
 
             # Pause before next subtitle
-            time.sleep(0.5)
+            deadline += PAUSE
+            self.wait_until(deadline)
 
-    def translate_subtitles(self, entries, target_language):
+        if shown == 0:
+            raise ExecutorError("No subtitles to display")
+
+    def wait_until(self, deadline):
+        """Sleep until time.perf_counter() reaches deadline"""
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def iter_translated(self, entries, target_language, out=None):
+        """
+        Translate subtitles a group at a time, giving each one back as soon
+        as its group is done. Only one group (about STREAM_BATCH_LINES
+        lines) is held in memory, so entries can come from a generator.
+
+        Args:
+            entries: Any iterable of SubtitleEntry objects
+            target_language: Target language name
+            out: Stream to write warnings to (default: sys.stdout)
+        """
+        group = []
+        lines = 0
+        for entry in entries:
+            group.append(entry)
+            lines += len(entry.text)
+            if lines >= STREAM_BATCH_LINES:
+                yield from self.translate_subtitles(group, target_language, out=out, progress=False)
+                group = []
+                lines = 0
+
+        if group:
+            yield from self.translate_subtitles(group, target_language, out=out, progress=False)
+
+    def translate_subtitles(self, entries, target_language, out=None, progress=True):
         """
         Translate all subtitle text to another language using Google Translate.
+        All lines are sent as one batch, packed several to a request (see Translator).
 
         Args:
             entries: List of SubtitleEntry objects
             target_language: Target language name
+            out: Stream to write progress to (default: sys.stdout)
+            progress: Show the "Translating line x/y" progress line
 
         Returns:
             New list of SubtitleEntry objects with translated text
         """
-        # Import the translation library
-        try:
-            from deep_translator import GoogleTranslator
-        except ImportError:
-            raise ExecutorError("Translation library not installed. Run: pip install deep-translator")
-
-        # Map language names to codes
-        language_codes = {
-            'filipino': 'tl',  # Tagalog
-            'tagalog': 'tl',
-            'korean': 'ko',
-            'chinese': 'zh-CN',
-            'japanese': 'ja',
-            'english': 'en'
-        }
-
-        # Get the language code
-        target_code = language_codes.get(target_language.lower())
-        if not target_code:
-            raise ExecutorError(f"Language '{target_language}' not supported")
-
-        # Create translator
-        translator = GoogleTranslator(source='en', target=target_code)
-
-        # Translate each subtitle
+        translator = self.get_translator(target_language)
+        entries = list(entries)  # gone through twice below
+
+        # Put every line of every subtitle into one flat list,
+        # so the whole file goes out as a single batch
+        all_lines = [line for entry in entries for line in entry.text]
+        translated_lines = translator.translate_batch(
+            all_lines,
+            progress=(lambda done, total: self.show_progress(done, total, out)) if progress and self.verbose else None,
+            out=out
+        )
+
+        # Cut the flat list back into each subtitle's lines
         translated_entries = []
-        for i, entry in enumerate(entries):
-            print(f"  Translating subtitle {i + 1}/{len(entries)}...", end='\r')
-
-            # Translate each line of text
-            translated_lines = []
-            for line in entry.text:
-                try:
-                    translated = translator.translate(line)
-                    translated_lines.append(translated)
-                except Exception as e:
-                    # If translation fails, keep original
-                    print(f"\n  Warning: Could not translate line, keeping original")
-                    translated_lines.append(line)
+        start = 0
+        for entry in entries:
+            end = start + len(entry.text)
+            lines = translated_lines[start:end]
+            start = end
+
+            # Nothing changed (like "♪ ♪", or a failed request),
+            # so the original entry can be used as it is
+            if lines == entry.text:
+                translated_entries.append(entry)
+                continue
 
             # Create new entry with translated text
-            from src.ast import SubtitleEntry
             new_entry = SubtitleEntry(
                 entry.index,
                 entry.start_time,
                 entry.end_time,
-                translated_lines
+                lines
             )
             translated_entries.append(new_entry)
 
         return translated_entries
 
+    def get_translator(self, target_language):
+        """Get the Translator for a language, making it the first time only"""
+        key = target_language.lower()
+        if key not in self.translators:
+            # Translations are also saved on disk, so running the same file
+            # again is fast (if the cache can't be opened we just skip it)
+            if self.disk_cache is None:
+                self.disk_cache = TranslationCache.open_default()
+
+            # Set up the translator (checks the library and the language)
+            try:
+                self.translators[key] = Translator(
+                    target_language,
+                    workers=self.workers,
+                    disk_cache=self.disk_cache,
+                    chunk_size=self.chunk_size,
+                    passthrough_patterns=self.passthrough_patterns
+                )
+            except TranslatorError as e:
+                raise ExecutorError(str(e))
+        return self.translators[key]
+
+    def show_progress(self, done, total, out=None):
+        """Show how many lines have been translated so far"""
+        # Redrawing the line on every update is wasted terminal writes,
+        # so only do it a few times a second (but always show the last one)
+        now = time.monotonic()
+        if done < total and now - self.last_progress < PROGRESS_INTERVAL:
+            return
+        self.last_progress = now
+        print(f"  Translating line {done}/{total}...", end='\r', file=out)
+
+    def report(self, message, out=None):
+        """Print a progress line, unless the executor was made with verbose=False"""
+        if self.verbose:
+            print(message, file=out)
+
     def format_time(self, timestamp):
         """
         Convert a TimeStamp to a nice display format.
@@ -122,8 +235,5 @@ class Executor:
         Returns:
             String like "00:01:30.500"
         """
-        hours = f"{timestamp.hours:02d}"
-        minutes = f"{timestamp.minutes:02d}"
-        seconds = f"{timestamp.seconds:02d}"
-        ms = f"{timestamp.milliseconds:03d}"
-        return f"{hours}:{minutes}:{seconds}.{ms}"
+        # TimeStamp formats this once and keeps it
+        return timestamp.to_display()
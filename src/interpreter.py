@@ -3,70 +3,316 @@ Interpreter - the main class that ties everything together.
 Read file -> Tokenize -> Parse -> Execute (with optional translation)
 """
 
+import io
+import os
+from collections import OrderedDict
+from multiprocessing import Pool
+
 from src.lexer import Lexer, LexerError
 from src.parser import Parser, ParserError
 from src.executor import Executor, ExecutorError
+from src.translator import DEFAULT_WORKERS, MAX_CHUNK_TEXTS, NO_TRANSLATION, PASSTHROUGH_PATTERNS
+
+
+# Most subtitles (over all files) an interpreter keeps parsed (see SRTInterpreter.run)
+PARSE_CACHE_ENTRIES = 50000
 
 
 class SRTInterpreter:
     """Main interpreter that coordinates all the parts"""
 
-    def __init__(self):
-        """Set up the interpreter"""
+    def __init__(self, workers=DEFAULT_WORKERS, chunk_size=MAX_CHUNK_TEXTS, strict=True,
+                 verbose=True, passthrough_patterns=PASSTHROUGH_PATTERNS):
+        """
+        Set up the interpreter.
+
+        Args:
+            workers: How many translation requests to send at the same time
+            chunk_size: Most subtitle lines to pack into one translation request
+            strict: Check that subtitles are numbered 1, 2, 3, ... (False skips
+                    that check for trusted, tool-made files)
+            verbose: Print the progress lines (Reading file, Step 1, Translating, ...).
+                     Errors and subtitles are always shown.
+            passthrough_patterns: Compiled regexes for whole subtitle lines to keep
+                                  untranslated (default: sound cues like "[LAUGHTER]")
+        """
         self.lexer = Lexer()
+        self.strict = strict
+        self.verbose = verbose
         self.parser = None
-        self.executor = Executor()
+        self.executor = Executor(workers=workers, chunk_size=chunk_size, verbose=verbose,
+                                 passthrough_patterns=passthrough_patterns)
+        # (path, modified time, size) -> (token count, entries), least recently used first
+        self.parse_cache = OrderedDict()
+        self.parse_cache_entries = 0  # subtitles held in parse_cache
+
+    def iter_entries(self, filepath):
+        """
+        Read an SRT file and give back its subtitles one at a time.
 
-    def run(self, filepath, language='english'):
+        Tokens are made and parsed as they are needed, so the full token
+        list is never built. Raises LexerError or ParserError if the file
+        is invalid (possibly after some entries were already given back).
+
+        Args:
+            filepath: Path to the .srt file
+        """
+        # The file is read line by line as the parser asks for more tokens
+        with open(filepath, 'r', encoding='utf-8') as f:
+            parser = Parser(self.lexer.tokenize_stream(f), strict=self.strict)
+            yield from parser.iter_parse()
+
+    def stream(self, filepath, language='english', out=None):
+        """
+        Show the subtitles of an SRT file while it is still being read.
+
+        Unlike run(), this never holds the whole file (or all its
+        subtitles) in memory, so it suits very big files. Translation
+        happens a group of subtitles at a time (see Executor.iter_translated).
+        It doesn't count tokens, and an error part way through the
+        file is only found once the subtitles before it were shown.
+
+        Args:
+            filepath: Path to the .srt file
+            language: Language to translate to (default: 'english' for no translation)
+            out: Stream to write output to (default: sys.stdout)
+        """
+        if not self.check_language(language, out):
+            return
+
+        # Open the file first, so problems writing the output
+        # aren't mistaken for problems reading the file
+        try:
+            f = open(filepath, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            print(f"Error: File not found - {filepath}", file=out)
+            return
+        except OSError as e:
+            print(f"Error reading file: {e}", file=out)
+            return
+
+        with f:
+            try:
+                # The parser reads the first token straight away,
+                # so even making it can find a bad file
+                parser = Parser(self.lexer.tokenize_stream(f), strict=self.strict)
+                entries = parser.iter_parse()
+                if language.lower() not in NO_TRANSLATION:
+                    entries = self.executor.iter_translated(entries, language, out=out)
+                self.executor.execute(entries, out=out)
+            except UnicodeDecodeError as e:
+                print(f"Error reading file: {e}", file=out)
+            except LexerError as e:
+                print(f"Lexer Error: {e}", file=out)
+            except ParserError as e:
+                print(f"Parser Error: {e}", file=out)
+            except ExecutorError as e:
+                print(f"Executor Error: {e}", file=out)
+
+    def run(self, filepath, language='english', out=None):
         """
         Run the interpreter on an SRT file.
 
         Args:
             filepath: Path to the .srt file
             language: Language to translate to (default: 'english' for no translation)
+            out: Stream to write output to (default: sys.stdout)
         """
-        print(f"Reading file: {filepath}\n")
+        self.report(f"Reading file: {filepath}\n", out)
 
         # Step 1: Read the file
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # newline='' skips converting line breaks while reading
+            # (the lexer understands '\r\n' and '\r' itself)
+            with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                # If this file was already parsed and hasn't changed since,
+                # reuse the result instead of reading and parsing it again
+                key = self.file_key(f)
+                parsed = self.cached_parse(key)
+                if parsed is None:
+                    content = f.read()
+                    # Changed while we were reading, so don't remember it
+                    if self.file_key(f) != key:
+                        key = None
         except FileNotFoundError:
-            print(f"Error: File not found - {filepath}")
+            print(f"Error: File not found - {filepath}", file=out)
             return
         except Exception as e:
-            print(f"Error reading file: {e}")
+            print(f"Error reading file: {e}", file=out)
             return
 
-        # Step 2: Tokenize (Lexer)
-        print("Step 1: Tokenizing...")
-        try:
-            tokens = self.lexer.tokenize(content)
-            print(f"  Found {len(tokens)} tokens\n")
-        except LexerError as e:
-            print(f"Lexer Error: {e}")
+        if not self.check_language(language, out):
             return
 
-        # Step 3: Parse (Parser)
-        print("Step 2: Parsing...")
-        try:
-            parser = Parser(tokens)
-            entries = parser.parse()
-            print(f"  Found {len(entries)} subtitles\n")
-        except ParserError as e:
-            print(f"Parser Error: {e}")
+        if parsed is None:
+            parsed = self.parse_content(content, out)
+            if parsed is None:
+                return
+            self.remember_parse(key, parsed)
+        else:
+            token_count, entries = parsed
+            self.report("Step 1: Tokenizing...", out)
+            self.report(f"  Found {token_count} tokens\n", out)
+            self.report("Step 2: Parsing...", out)
+            self.report(f"  Found {len(entries)} subtitles\n", out)
+
+        self.display(parsed[1], language, out)
+
+    def interpret_string(self, content, language='english', out=None):
+        """
+        Run the interpreter on SRT text that is already in memory.
+
+        Args:
+            content: The full text of an SRT file
+            language: Language to translate to (default: 'english' for no translation)
+            out: Stream to write output to (default: sys.stdout)
+        """
+        if not self.check_language(language, out):
             return
 
+        parsed = self.parse_content(content, out)
+        if parsed is None:
+            return
+
+        self.display(parsed[1], language, out)
+
+    def check_language(self, language, out=None):
+        """Check the language (and the translation library) before doing any work"""
+        if language.lower() not in NO_TRANSLATION:
+            try:
+                self.executor.get_translator(language)
+            except ExecutorError as e:
+                print(f"Executor Error: {e}", file=out)
+                return False
+        return True
+
+    def parse_content(self, content, out=None):
+        """
+        Tokenize and parse SRT text, printing how it went.
+
+        Returns:
+            (number of tokens, list of SubtitleEntry), or None if the text is invalid
+        """
+        # The lexer and parser run together: the parser takes each token
+        # as soon as the lexer makes it, so the full token list is never built
+        self.report("Step 1: Tokenizing...", out)
+        counter = TokenCounter(self.lexer.iter_tokens(content))
+        parse_error = None
+        try:
+            try:
+                entries = Parser(counter, strict=self.strict).parse()
+            except ParserError as e:
+                # Finish tokenizing anyway: a lexer error further down the file
+                # is reported first, and we need the full token count
+                parse_error = e
+                for token in counter:
+                    pass
+        except LexerError as e:
+            print(f"Lexer Error: {e}", file=out)
+            return None
+        self.report(f"  Found {counter.count} tokens\n", out)
+
+        self.report("Step 2: Parsing...", out)
+        if parse_error is not None:
+            print(f"Parser Error: {parse_error}", file=out)
+            return None
+        self.report(f"  Found {len(entries)} subtitles\n", out)
+
+        return counter.count, entries
+
+    def display(self, entries, language='english', out=None):
+        """Show the parsed subtitles (translating them first if asked)"""
         # Step 4: Execute (show subtitles, with optional translation)
-        print(f"Step 3: Displaying subtitles")
-        if language.lower() != 'english':
-            print(f"  (will translate to {language})")
-        print()
+        self.report(f"Step 3: Displaying subtitles", out)
+        if language.lower() not in NO_TRANSLATION:
+            self.report(f"  (will translate to {language})", out)
+        self.report("", out)
 
         try:
-            self.executor.execute(entries, translate_to=language)
+            self.executor.execute(entries, translate_to=language, out=out)
         except ExecutorError as e:
-            print(f"Executor Error: {e}")
+            print(f"Executor Error: {e}", file=out)
             return
 
-        print("\nDone!")
+        self.report("\nDone!", out)
+
+    def report(self, message, out=None):
+        """Print a progress line, unless the interpreter was made with verbose=False"""
+        if self.verbose:
+            print(message, file=out)
+
+    def file_key(self, file):
+        """
+        Something that changes whenever the open file does: (full path, modified time, size).
+        Gives back None if the file can't be looked at.
+        """
+        try:
+            info = os.fstat(file.fileno())
+        except OSError:
+            return None
+        return (os.path.abspath(file.name), info.st_mtime_ns, info.st_size)
+
+    def cached_parse(self, key):
+        """Get a file's parse from the cache (marking it as recently used), or None"""
+        parsed = self.parse_cache.get(key)
+        if parsed is not None:
+            self.parse_cache.move_to_end(key)
+        return parsed
+
+    def remember_parse(self, key, parsed):
+        """Keep a parsed file for next time, forgetting the least recently used ones if needed"""
+        size = len(parsed[1])
+        if key is None or size > PARSE_CACHE_ENTRIES:
+            return  # a file too big for the whole cache isn't kept at all
+        self.parse_cache[key] = parsed
+        self.parse_cache_entries += size
+        while self.parse_cache_entries > PARSE_CACHE_ENTRIES:
+            old_key, (token_count, entries) = self.parse_cache.popitem(last=False)
+            self.parse_cache_entries -= len(entries)
+
+
+class TokenCounter:
+    """Passes tokens through unchanged, counting them on the way"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = next(self.tokens)
+        self.count += 1
+        return token
+
+
+def interpret_to_text(filepath, language='english', verbose=True):
+    """
+    Run a fresh interpreter on one file and give back everything it printed.
+    Used by batch_interpret (each worker process runs this).
+    """
+    buffer = io.StringIO()
+    SRTInterpreter(verbose=verbose).run(filepath, language, out=buffer)
+    return buffer.getvalue()
+
+
+def batch_interpret(paths, language='english', processes=None, verbose=True):
+    """
+    Run the interpreter on many SRT files at the same time.
+
+    Each file gets its own process (with its own lexer, parser, executor
+    and translator), so the files don't wait on each other. They all
+    share the same translation cache on disk.
+
+    Args:
+        paths: List of paths to .srt files
+        language: Language to translate to (default: 'english' for no translation)
+        processes: How many files to work on at once (default: number of CPUs)
+        verbose: Include the progress lines in each output (see SRTInterpreter)
+
+    Returns:
+        List of the output for each file, in the same order as paths
+    """
+    with Pool(processes) as pool:
+        return pool.starmap(interpret_to_text, [(path, language, verbose) for path in paths])
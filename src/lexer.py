@@ -5,7 +5,30 @@ Think of it like breaking a sentence into words.
 
 import re
 from src.ast import Token, TOKEN_INDEX, TOKEN_TIMESTAMP, TOKEN_ARROW
-from src.ast import TOKEN_TEXT, TOKEN_NEWLINE, TOKEN_BLANK_LINE, TOKEN_EOF
+from src.ast import TOKEN_TEXT, TOKEN_BLANK_LINE, TOKEN_EOF
+
+
+# A whole timestamp line like "00:00:01,000 --> 00:00:03,000" in one match
+TIMESTAMP_LINE_PATTERN = re.compile(
+    r'\s*(\d{2}:\d{2}:\d{2},\d{3})\s+(-->)\s+(\d{2}:\d{2}:\d{2},\d{3})\s*'
+)
+
+# A single timestamp like "00:00:01,000" (used to explain what's wrong with a bad line)
+TIMESTAMP_PATTERN = re.compile(r'^\d{2}:\d{2}:\d{2},\d{3}$')
+
+
+def split_line_breaks(text):
+    """
+    Split text into lines at '\r\n', '\r' and '\n' only.
+
+    str.splitlines() also breaks on characters like '\f' or '\u2028',
+    which can be part of subtitle text. A line break at the very end
+    still starts one more (empty) line, so '' gives [''].
+    """
+    # Turn every line break into '\n' first, then split with one C-level call
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.split('\n')
 
 
 class LexerError(Exception):
@@ -17,55 +40,80 @@ class Lexer:
     """Reads the SRT file and breaks it into tokens"""
 
     def __init__(self):
-        # Patterns to recognize different parts of the file
-        self.timestamp_pattern = re.compile(r'^\d{2}:\d{2}:\d{2},\d{3}$')
-        self.index_pattern = re.compile(r'^\d+$')
         self.tokens = []
         self.line_number = 0
 
     def tokenize(self, text):
         """Break the file text into a list of tokens"""
-        self.tokens = []
-        self.line_number = 0
-
-        # Split the file into lines
-        lines = text.split('\n')
-
-        # Process each line
-        for i in range(len(lines)):
-            self.line_number = i + 1
-            line = lines[i]
-            self.process_line(line)
-
-        # Add an end-of-file token at the end
-        self.tokens.append(Token(TOKEN_EOF, "", self.line_number))
-
+        self.tokens = list(self.iter_tokens(text))
         return self.tokens
 
-    def process_line(self, line):
-        """Figure out what kind of line this is and create tokens"""
-
-        # Is it a blank line?
-        if self.is_blank(line):
-            self.tokens.append(Token(TOKEN_BLANK_LINE, line, self.line_number))
-            return
+    def iter_tokens(self, text):
+        """
+        Same as tokenize(), but gives back the tokens one line at a time
+        instead of building the whole list (saves memory on big files).
+        """
+        return self.iter_line_tokens(split_line_breaks(text))
+
+    def tokenize_stream(self, file):
+        """
+        Give back tokens while reading an open file, so the whole file
+        never has to be in memory at once.
+
+        Args:
+            file: An open text file (or any iterable of lines)
+        """
+        return self.iter_line_tokens(self.split_lines(file))
+
+    def split_lines(self, file):
+        """Give back the lines of a file without their line breaks (see split_line_breaks)"""
+        ends_with_break = True  # an empty file is one empty line
+        for line in file:
+            lines = split_line_breaks(line)
+            ends_with_break = lines[-1] == ''
+            if ends_with_break:
+                lines.pop()  # the next line (if any) comes from the file
+            yield from lines
+
+        # A line break at the very end still starts one more (empty) line
+        if ends_with_break:
+            yield ''
+
+    def iter_line_tokens(self, lines):
+        """Turn lines (without their line breaks) into tokens"""
+        # Work out what kind of line each one is and give back its tokens
+        # straight away (no method call or temporary list for each line)
+        line_number = 0
+        for line in lines:
+            line_number += 1
+            stripped = line.strip()
+
+            if not stripped:
+                yield Token(TOKEN_BLANK_LINE, line, line_number)
+
+            elif stripped.isdecimal():
+                yield Token(TOKEN_INDEX, stripped, line_number)
+
+            elif '-->' in line:
+                match = TIMESTAMP_LINE_PATTERN.fullmatch(line)
+                if match:
+                    start_time, arrow, end_time = match.groups()
+                    yield Token(TOKEN_TIMESTAMP, start_time, line_number)
+                    yield Token(TOKEN_ARROW, arrow, line_number)
+                    yield Token(TOKEN_TIMESTAMP, end_time, line_number)
+                else:
+                    # Not a clean timestamp line, go the slow way to get a good error message
+                    self.line_number = line_number
+                    self.tokens = []
+                    self.process_timestamp_line(line)
+                    yield from self.tokens
+
+            else:
+                yield Token(TOKEN_TEXT, line, line_number)
 
-        # Is it an index number?
-        stripped = line.strip()
-        if self.index_pattern.match(stripped):
-            self.tokens.append(Token(TOKEN_INDEX, stripped, self.line_number))
-            self.tokens.append(Token(TOKEN_NEWLINE, '\n', self.line_number))
-            return
-
-        # Does it have timestamps with an arrow?
-        if '-->' in line:
-            self.process_timestamp_line(line)
-            return
-
-        # Otherwise it's text content
-        if stripped != '':
-            self.tokens.append(Token(TOKEN_TEXT, line, self.line_number))
-            self.tokens.append(Token(TOKEN_NEWLINE, '\n', self.line_number))
+        # Add an end-of-file token at the end
+        self.line_number = line_number
+        yield Token(TOKEN_EOF, "", self.line_number)
 
     def process_timestamp_line(self, line):
         """Handle a line like: 00:00:01,000 --> 00:00:03,000"""
@@ -80,21 +128,16 @@ class Lexer:
         end_time = parts[2]
 
         # Check if they look right
-        if not self.timestamp_pattern.match(start_time):
+        if not TIMESTAMP_PATTERN.match(start_time):
             raise LexerError(f"Line {self.line_number}: Bad start time '{start_time}'")
 
         if arrow != '-->':
             raise LexerError(f"Line {self.line_number}: Expected '-->', got '{arrow}'")
 
-        if not self.timestamp_pattern.match(end_time):
+        if not TIMESTAMP_PATTERN.match(end_time):
             raise LexerError(f"Line {self.line_number}: Bad end time '{end_time}'")
 
         # Create the tokens
         self.tokens.append(Token(TOKEN_TIMESTAMP, start_time, self.line_number))
         self.tokens.append(Token(TOKEN_ARROW, arrow, self.line_number))
         self.tokens.append(Token(TOKEN_TIMESTAMP, end_time, self.line_number))
-        self.tokens.append(Token(TOKEN_NEWLINE, '\n', self.line_number))
-
-    def is_blank(self, line):
-        """Check if a line is empty or just whitespace"""
-        return line.strip() == ''
@@ -3,9 +3,14 @@ Parser - takes tokens and builds subtitle entries.
 Checks if everything is in the right order and makes sense.
 """
 
-from src.ast import TimeStamp, SubtitleEntry
+from src.ast import Token, TimeStamp, SubtitleEntry
 from src.ast import TOKEN_INDEX, TOKEN_TIMESTAMP, TOKEN_ARROW, TOKEN_TEXT
-from src.ast import TOKEN_NEWLINE, TOKEN_BLANK_LINE, TOKEN_EOF
+from src.ast import TOKEN_BLANK_LINE, TOKEN_EOF
+
+
+# Stands in for "no more tokens", so self.current is never None
+# (the lexer always ends with its own EOF token, this covers token lists that don't)
+END_OF_TOKENS = Token(TOKEN_EOF, "", 0)
 
 
 class ParserError(Exception):
@@ -24,87 +29,96 @@ class Parser:
     - A blank line
     """
 
-    def __init__(self, tokens):
-        self.tokens = tokens  # list of all tokens
-        self.position = 0  # where we are in the list
-        self.current = tokens[0] if tokens else None  # current token
+    def __init__(self, tokens, strict=True):
+        """
+        Args:
+            tokens: A list or any iterator of tokens (like Lexer.iter_tokens),
+                    we only ever look at one token at a time
+            strict: Check that subtitles are numbered 1, 2, 3, ... (turn off
+                    for trusted files to skip that check)
+        """
+        self.tokens = iter(tokens)
+        self.strict = strict
+        self.last_end = (None, None)  # (text, TimeStamp) of the last end time parsed
+        self.current = next(self.tokens, END_OF_TOKENS)  # current token
 
     def parse(self):
-        """Go through all tokens and build subtitle entries"""
-        entries = []
+        """Go through all tokens and build a list of subtitle entries"""
+        return list(self.iter_parse())
+
+    def iter_parse(self):
+        """
+        Go through all tokens and give back subtitle entries one at a time.
+        Lets big files be processed without keeping every entry in memory.
+        """
+        count = 0
         expected_index = 1  # subtitles should be numbered 1, 2, 3, ...
 
         # Keep going until we hit the end
-        while self.current and self.current.type != TOKEN_EOF:
+        while self.current.type != TOKEN_EOF:
             # Skip blank lines at the start
             if self.current.type == TOKEN_BLANK_LINE:
                 self.move_next()
                 continue
 
             # Parse one subtitle
-            entry = self.parse_subtitle(expected_index)
-            entries.append(entry)
+            yield self.parse_subtitle(expected_index)
+            count += 1
             expected_index += 1
 
         # Make sure we found at least one subtitle
-        if len(entries) == 0:
+        if count == 0:
             raise ParserError("No subtitles found in file")
 
-        return entries
-
     def parse_subtitle(self, expected_index):
         """Parse one complete subtitle entry"""
 
         # Step 1: Get the index number
-        if not self.current or self.current.type != TOKEN_INDEX:
+        if self.current.type != TOKEN_INDEX:
             raise ParserError(f"Expected subtitle number {expected_index}")
 
-        index = int(self.current.value)
-
         # Check if it's the right number (sequential)
-        if index != expected_index:
-            raise ParserError(f"Expected subtitle {expected_index}, got {index}")
+        if self.strict:
+            index = int(self.current.value)
+            if index != expected_index:
+                raise ParserError(f"Expected subtitle {expected_index}, got {index}")
+        else:
+            index = expected_index  # trust the file, number them in order
 
         self.move_next()
 
-        # Step 2: Expect a newline after the index
-        self.expect(TOKEN_NEWLINE)
-
-        # Step 3: Get the timestamps
+        # Step 2: Get the timestamps
         start_time, end_time = self.parse_timestamps()
 
-        # Step 4: Expect a newline after timestamps
-        self.expect(TOKEN_NEWLINE)
-
-        # Step 5: Get the text lines
+        # Step 3: Get the text lines
         text_lines = self.parse_text()
 
-        # Step 6: Expect a blank line at the end
+        # Step 4: Expect a blank line at the end
         self.expect(TOKEN_BLANK_LINE)
 
-        # Create the subtitle entry
-        entry = SubtitleEntry(index, start_time, end_time, text_lines)
-
-        # Make sure it's valid
-        try:
-            entry.validate()
-        except ValueError as e:
-            raise ParserError(f"Subtitle {index} is invalid: {e}")
-
-        return entry
+        # Create the subtitle entry. No need to call validate() on it:
+        # the steps above already made sure the index is positive, start
+        # is before end, and there is text (TEXT tokens are never blank)
+        return SubtitleEntry(index, start_time, end_time, text_lines)
 
     def parse_timestamps(self):
         """Parse the timestamp line: start --> end"""
 
         # Get start timestamp
-        if not self.current or self.current.type != TOKEN_TIMESTAMP:
+        if self.current.type != TOKEN_TIMESTAMP:
             raise ParserError("Expected start time")
 
         start_str = self.current.value
-        try:
-            start_time = TimeStamp.from_string(start_str)
-        except ValueError as e:
-            raise ParserError(f"Bad start time: {e}")
+
+        # Subtitles often start exactly when the one before ended,
+        # so reuse that TimeStamp instead of parsing the same text again
+        if start_str == self.last_end[0]:
+            start_time = self.last_end[1]
+        else:
+            try:
+                start_time = TimeStamp.from_string(start_str)
+            except ValueError as e:
+                raise ParserError(f"Bad start time: {e}")
 
         self.move_next()
 
@@ -112,7 +126,7 @@ class Parser:
         self.expect(TOKEN_ARROW)
 
         # Get end timestamp
-        if not self.current or self.current.type != TOKEN_TIMESTAMP:
+        if self.current.type != TOKEN_TIMESTAMP:
             raise ParserError("Expected end time")
 
         end_str = self.current.value
@@ -120,6 +134,7 @@ class Parser:
             end_time = TimeStamp.from_string(end_str)
         except ValueError as e:
             raise ParserError(f"Bad end time: {e}")
+        self.last_end = (end_str, end_time)
 
         self.move_next()
 
@@ -134,33 +149,23 @@ class Parser:
         text_lines = []
 
         # Should have at least one line of text
-        if not self.current or self.current.type != TOKEN_TEXT:
+        if self.current.type != TOKEN_TEXT:
             raise ParserError("Subtitle needs text")
 
         # Collect all text lines
-        while self.current and self.current.type == TOKEN_TEXT:
+        while self.current.type == TOKEN_TEXT:
             text_lines.append(self.current.value)
             self.move_next()
 
-            # Move past newline if there is one
-            if self.current and self.current.type == TOKEN_NEWLINE:
-                self.move_next()
-            else:
-                break
-
         return text_lines
 
     def expect(self, token_type):
         """Make sure current token is the type we expect"""
-        if not self.current or self.current.type != token_type:
-            current_type = self.current.type if self.current else 'end of file'
-            raise ParserError(f"Expected {token_type}, got {current_type}")
+        if self.current.type != token_type:
+            current_type = 'end of file' if self.current is END_OF_TOKENS else self.current.type.name
+            raise ParserError(f"Expected {token_type.name}, got {current_type}")
         self.move_next()
 
     def move_next(self):
         """Move to the next token"""
-        self.position += 1
-        if self.position < len(self.tokens):
-            self.current = self.tokens[self.position]
-        else:
-            self.current = None
+        self.current = next(self.tokens, END_OF_TOKENS)
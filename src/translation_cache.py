@@ -0,0 +1,96 @@
+"""
+Translation cache - remembers translations on disk between runs.
+Translating the same file (or the same show) again then needs
+few or no network requests.
+"""
+
+import hashlib
+import os
+import sqlite3
+
+
+# Where the cache lives unless told otherwise
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'srt_interp', 'cache.db')
+
+# Save to disk after this many new translations
+COMMIT_EVERY = 100
+
+
+class TranslationCache:
+    """A (language code, text) -> translation table stored in SQLite"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        # Only one thread uses it at a time, but not always the one that opened it
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets several processes (see batch_interpret) read and write it at once
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS t ("
+            "lang TEXT, h BLOB, src TEXT, dst TEXT, PRIMARY KEY (lang, h))"
+        )
+        self.conn.commit()
+        self.unsaved = 0  # translations added since the last commit
+
+    @staticmethod
+    def open_default():
+        """Open the cache at DEFAULT_PATH, or give back None if we can't"""
+        try:
+            return TranslationCache()
+        except (OSError, sqlite3.Error):
+            return None
+
+    def get(self, lang, text):
+        """Get the saved translation of text, or None if there isn't one"""
+        try:
+            row = self.conn.execute(
+                "SELECT src, dst FROM t WHERE lang = ? AND h = ?",
+                (lang, self.make_key(text))
+            ).fetchone()
+        except sqlite3.Error:
+            return None  # a broken cache just means a cache miss
+
+        # Compare the text too, just in case two texts share a hash
+        if row is None or row[0] != text:
+            return None
+        return row[1]
+
+    def put(self, lang, text, translated):
+        """Save a translation (written to disk in batches, see flush)"""
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO t (lang, h, src, dst) VALUES (?, ?, ?, ?)",
+                (lang, self.make_key(text), text, translated)
+            )
+        except sqlite3.Error:
+            return  # not being able to save shouldn't stop the translation
+        self.unsaved += 1
+        if self.unsaved >= COMMIT_EVERY:
+            self.flush()
+
+    def flush(self):
+        """Write any unsaved translations to disk"""
+        if self.unsaved:
+            try:
+                self.conn.commit()
+            except sqlite3.Error:
+                pass
+            self.unsaved = 0
+
+    def close(self):
+        """Save and close the cache file"""
+        self.flush()
+        self.conn.close()
+
+    def make_key(self, text):
+        """Short fixed-size key for a text"""
+        return hashlib.sha1(text.encode('utf-8')).digest()
@@ -0,0 +1,347 @@
+"""
+Translator - sends subtitle text to Google Translate.
+Several subtitles are packed into one request so a whole file only
+needs a handful of round trips instead of one per line.
+"""
+
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# The translation library is only needed when actually translating
+try:
+    from deep_translator import GoogleTranslator
+except ImportError:
+    GoogleTranslator = None
+
+from src.defaults import DEFAULT_WORKERS, MAX_CHUNK_TEXTS
+
+
+class TranslatorError(Exception):
+    """Error when the translator can't be set up"""
+    pass
+
+
+# Map language names to codes
+LANGUAGE_CODES = {
+    'filipino': 'tl',  # Tagalog
+    'tagalog': 'tl',
+    'korean': 'ko',
+    'chinese': 'zh-CN',
+    'japanese': 'ja',
+    'english': 'en'
+}
+
+# Language names we can translate to, and the same list ready for messages
+SUPPORTED_LANGUAGES = tuple(LANGUAGE_CODES)
+SUPPORTED_LANGUAGES_TEXT = ', '.join(SUPPORTED_LANGUAGES)
+
+# Language names that mean "keep the original English" (nothing to translate)
+NO_TRANSLATION = frozenset({'english', 'en'})
+
+# Goes between texts that share one request (unlikely to appear in subtitles)
+# Numbered, so we can tell which texts came back intact if some separators get lost
+SEPARATOR = "\n<<<SRT_SEP_{}>>>\n"
+
+# Matches the separator after translation (Google may move the spaces around)
+SEPARATOR_PATTERN = re.compile(r'\s*<<<\s*SRT_SEP_(\d+)\s*>>>\s*')
+
+# Lines with no letters at all ("...", "♪ ♪", "123") have nothing to translate
+LETTER_PATTERN = re.compile(r'[A-Za-z]')
+
+# Sound cues like "[LAUGHTER]", "(DOOR SLAMS!)" or "[MAN'S VOICE]" are left as
+# they are, they often stay in English even in translated subtitles.
+# A cue is capital letters, digits, spaces and ' . , ! ? - inside [ ] or ( ),
+# with at least one letter (so "[123]" isn't mistaken for one).
+SOUND_CUE_PATTERN = re.compile(r"[\[\(](?=[^\]\)]*[A-Z])[A-Z0-9\s'.,!?-]+[\]\)]")
+
+# Lines matching any of these (after stripping spaces) are never sent
+PASSTHROUGH_PATTERNS = (SOUND_CUE_PATTERN,)
+
+# Google Translate refuses requests longer than this
+MAX_REQUEST_CHARS = 5000
+
+# Recent translations shared by every Translator: (language code, text) -> translation.
+# Subtitles repeat a lot ("Yes.", "[Music]"), so this saves many requests.
+CACHE_SIZE = 10000
+translation_cache = OrderedDict()
+
+# Translators in different threads share the cache, so only one may change it at a time
+cache_lock = threading.Lock()
+
+
+class Translator:
+    """Translates English subtitle text into another language"""
+
+    def __init__(self, target_language, workers=DEFAULT_WORKERS, disk_cache=None,
+                 chunk_size=MAX_CHUNK_TEXTS, passthrough_patterns=PASSTHROUGH_PATTERNS):
+        """
+        Set up a translator for one target language.
+
+        Args:
+            target_language: Target language name (e.g., 'filipino', 'korean')
+            workers: How many requests to send at the same time
+            disk_cache: Optional TranslationCache that keeps translations between runs
+            chunk_size: Most texts to pack into one request (1 = one request per text)
+            passthrough_patterns: Compiled regexes for whole lines to keep untranslated
+        """
+        # Make sure the translation library was found
+        if GoogleTranslator is None:
+            raise TranslatorError("Translation library not installed. Run: pip install deep-translator")
+
+        # Get the language code
+        self.target_code = LANGUAGE_CODES.get(target_language.lower())
+        if not self.target_code:
+            raise TranslatorError(
+                f"Language '{target_language}' not supported (choose from: {SUPPORTED_LANGUAGES_TEXT})"
+            )
+
+        self.backend_class = GoogleTranslator
+        self.workers = max(1, workers)
+        self.disk_cache = disk_cache
+        self.chunk_size = max(1, chunk_size)
+        self.passthrough_patterns = tuple(passthrough_patterns)
+
+        # GoogleTranslator changes its own state on every call,
+        # so each worker thread gets its own copy
+        self.local = threading.local()
+
+        # Why requests failed during the current batch (shared by the worker threads)
+        self.errors = set()
+        self.errors_lock = threading.Lock()
+
+    def get_backend(self):
+        """Get the GoogleTranslator that belongs to the current thread"""
+        backend = getattr(self.local, 'backend', None)
+        if backend is None:
+            backend = self.backend_class(source='en', target=self.target_code)
+            self.local.backend = backend
+        return backend
+
+    def translate_batch(self, texts, progress=None, out=None):
+        """
+        Translate a list of texts using as few requests as possible.
+
+        Args:
+            texts: List of strings to translate
+            progress: Optional function called as progress(done, total)
+            out: Stream to write the failure summary to (default: sys.stdout)
+
+        Returns:
+            List of translated strings (same length and order as texts).
+            A text that can't be translated is returned unchanged.
+        """
+        results = [None] * len(texts)
+
+        # Use cached translations first. Each different text that is left
+        # is only sent once, however many times it appears.
+        # Texts are compared without their outer spaces (Google drops
+        # them anyway), so "Yes." and " Yes. " share one translation.
+        pending = {}  # stripped text -> positions in texts where it appears
+        for i, text in enumerate(texts):
+            if not self.needs_translation(text):
+                results[i] = text
+                continue
+
+            key = text.strip()
+            cached = self.cache_lookup(key)
+            if cached is None:
+                pending.setdefault(key, []).append(i)
+            else:
+                results[i] = self.keep_spaces(text, cached)
+
+        if not pending:
+            return results
+
+        unique = list(pending)
+        chunks = self.make_chunks(unique)
+        done = len(texts) - sum(len(positions) for positions in pending.values())
+        position = 0  # how far through unique we are
+        failed = 0  # lines kept in English
+        self.errors = set()
+
+        # Requests spend nearly all their time waiting on the network,
+        # so running them in threads overlaps that waiting
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+            # map() hands results back in the same order as the chunks
+            for translated in pool.map(self.translate_chunk, chunks):
+                for result in translated:
+                    text = unique[position]
+                    position += 1
+                    if result is None:
+                        # Failed, keep each original line as it was (not cached)
+                        for i in pending[text]:
+                            results[i] = texts[i]
+                        failed += len(pending[text])
+                    else:
+                        self.cache_store(text, result)
+                        for i in pending[text]:
+                            results[i] = self.keep_spaces(texts[i], result)
+                    done += len(pending[text])
+                if progress:
+                    progress(done, len(texts))
+
+        # One warning for the whole batch, instead of one per failed line
+        # (a rate limit can fail hundreds of lines in a row)
+        if failed:
+            reasons = ', '.join(sorted(self.errors)) or 'no result'
+            print(f"\n  Warning: Could not translate {failed} line(s), keeping original ({reasons})", file=out)
+
+        if self.disk_cache is not None:
+            self.disk_cache.flush()
+        return results
+
+    def needs_translation(self, text):
+        """Check if a text has any (English) letters worth sending"""
+        if LETTER_PATTERN.search(text) is None:
+            return False
+
+        stripped = text.strip()
+        for pattern in self.passthrough_patterns:
+            if pattern.fullmatch(stripped):
+                return False
+        return True
+
+    def keep_spaces(self, original, translated):
+        """Put the spaces around the original text back around its translation"""
+        stripped = original.strip()
+        if len(stripped) == len(original):
+            return translated  # nothing to put back (most lines)
+
+        start = len(original) - len(original.lstrip())
+        return original[:start] + translated + original[start + len(stripped):]
+
+    def cache_lookup(self, text):
+        """Get a cached translation (memory first, then disk), or None"""
+        key = (self.target_code, text)
+        with cache_lock:
+            translated = translation_cache.get(key)
+            if translated is not None:
+                translation_cache.move_to_end(key)  # mark as recently used
+                return translated
+
+        if self.disk_cache is not None:
+            translated = self.disk_cache.get(self.target_code, text)
+            if translated is not None and translated.strip():
+                self.remember(text, translated)
+            else:
+                translated = None  # missing, or an empty one saved by an older version
+        return translated
+
+    def cache_store(self, text, translated):
+        """Save a new translation in memory and on disk (empty ones are never kept)"""
+        if not translated.strip():
+            return
+        self.remember(text, translated)
+        if self.disk_cache is not None:
+            self.disk_cache.put(self.target_code, text, translated)
+
+    def remember(self, text, translated):
+        """Keep a translation in memory, dropping the oldest one if the cache is full"""
+        key = (self.target_code, text)
+        with cache_lock:
+            translation_cache[key] = translated
+            translation_cache.move_to_end(key)
+            if len(translation_cache) > CACHE_SIZE:
+                translation_cache.popitem(last=False)
+
+    def make_chunks(self, texts):
+        """Group texts so each group fits in one request"""
+        chunks = []
+        chunk = []
+        size = 0
+
+        separator_size = len(SEPARATOR.format(self.chunk_size))  # longest separator used
+
+        for text in texts:
+            added = len(text) + separator_size
+            if chunk and (size + added > MAX_REQUEST_CHARS or len(chunk) == self.chunk_size):
+                chunks.append(chunk)
+                chunk = []
+                size = 0
+            chunk.append(text)
+            size += added
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def translate_chunk(self, chunk):
+        """Translate one group of texts in a single request"""
+        if len(chunk) == 1:
+            return [self.translate_text(chunk[0])]
+
+        try:
+            translated = self.get_backend().translate(self.join_chunk(chunk))
+        except Exception as e:
+            # The request itself failed (like too many requests), so sending
+            # each text on its own would only fail the same way, many more times
+            self.record_error(e)
+            return [None] * len(chunk)
+
+        parts = self.split_reply(translated, len(chunk)) if translated else {}
+
+        # Texts whose separators didn't survive fall back to one request per text
+        return [parts[i] if i in parts else self.translate_text(text)
+                for i, text in enumerate(chunk)]
+
+    def join_chunk(self, chunk):
+        """Join texts into one request: text 0, separator 1, text 1, separator 2, ..."""
+        joined = [chunk[0]]
+        for number, text in enumerate(chunk[1:], 1):
+            joined.append(SEPARATOR.format(number))
+            joined.append(text)
+        return ''.join(joined)
+
+    def split_reply(self, translated, count):
+        """
+        Cut a translated chunk back into its texts.
+
+        Args:
+            translated: The translation of join_chunk(chunk)
+            count: How many texts were in the chunk
+
+        Returns:
+            Dict of position in the chunk -> translated text, only for texts
+            whose own separator and the next one both came back (once each)
+            with something in between
+        """
+        # split() gives [text, number, text, number, text, ...]
+        pieces = SEPARATOR_PATTERN.split(translated.strip())
+        texts = pieces[0::2]
+        numbers = [0] + [int(number) for number in pieces[1::2]]
+
+        # A number that came back twice can't tell us which copy is right
+        seen = Counter(numbers)
+
+        parts = {}
+        for i, (number, text) in enumerate(zip(numbers, texts)):
+            # If a separator was lost, the text before it swallowed the next
+            # text too, so it can only be trusted if the next number follows on
+            following = numbers[i + 1] if i + 1 < len(numbers) else count
+            # An empty part lost its text somewhere (we only ever send text)
+            if following == number + 1 and seen[number] == 1 and text.strip():
+                parts[number] = text
+        return parts
+
+    def translate_text(self, text):
+        """Translate a single text, or give back None if it fails"""
+        try:
+            translated = self.get_backend().translate(text)
+        except Exception as e:
+            self.record_error(e)
+            return None
+
+        # The library returns None (or nothing) when it can't find a result
+        if not translated or not translated.strip():
+            return None
+        return translated
+
+    def record_error(self, error):
+        """Remember why a request failed, translate_batch reports it once at the end"""
+        reason = type(error).__name__
+        if str(error):
+            reason += f": {error}"
+        with self.errors_lock:
+            self.errors.add(reason)
@@ -0,0 +1,45 @@
+"""
+A stand-in for deep_translator's GoogleTranslator, so the tests never
+touch the network. It gives back the text in capitals by default.
+"""
+
+import unittest
+from unittest import mock
+
+import src.executor
+import src.translator
+
+
+class FakeGoogleTranslator:
+    """Answers translate() with reply(text), remembering every text it was sent"""
+
+    requests = []  # every text sent, by any instance
+    reply = staticmethod(str.upper)  # tests swap this out to change the answers
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+
+    def translate(self, text):
+        FakeGoogleTranslator.requests.append(text)
+        return FakeGoogleTranslator.reply(text)
+
+
+class FakeTranslatorTestCase(unittest.TestCase):
+    """Test case that uses FakeGoogleTranslator, no disk cache and no pauses"""
+
+    def setUp(self):
+        FakeGoogleTranslator.requests = []
+        FakeGoogleTranslator.reply = staticmethod(str.upper)
+
+        # Translations from other tests mustn't count as cache hits
+        src.translator.translation_cache.clear()
+
+        patches = [
+            mock.patch('src.translator.GoogleTranslator', FakeGoogleTranslator),
+            mock.patch.object(src.executor.TranslationCache, 'open_default', return_value=None),
+            mock.patch('src.executor.PAUSE', 0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
@@ -0,0 +1,69 @@
+"""Tests for showing and translating subtitles (src/executor.py)"""
+
+import io
+import unittest
+from unittest import mock
+
+from src.executor import Executor, ExecutorError
+from src.lexer import Lexer
+from src.parser import Parser
+from tests.fake_translator import FakeGoogleTranslator, FakeTranslatorTestCase
+
+
+BASIC = "1\n00:00:01,000 --> 00:00:03,000\nHello, world!\n\n2\n00:00:04,000 --> 00:00:06,000\nThis is a test.\n"
+
+
+class FakeClock:
+    """Stands in for time.perf_counter and time.sleep, without any real waiting"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+
+class ExecuteTest(FakeTranslatorTestCase):
+
+    def test_late_entry_gets_full_pauses(self):
+        clock = FakeClock()
+        first, second = Parser(Lexer().iter_tokens(BASIC)).parse()
+
+        def entries():
+            yield first
+            clock.now += 10  # like waiting for the next group to be translated
+            yield second
+
+        with mock.patch('src.executor.PAUSE', 0.5), \
+                mock.patch('src.executor.time.perf_counter', clock.perf_counter), \
+                mock.patch('src.executor.time.sleep', clock.sleep):
+            Executor().execute(entries(), out=io.StringIO())
+
+        # Both subtitles still get their DISPLAY and CLEAR pauses
+        self.assertEqual(clock.slept, 2.0)
+
+    def test_empty_generator(self):
+        with self.assertRaises(ExecutorError):
+            Executor().execute(iter([]), out=io.StringIO())
+
+
+class IterTranslatedTest(FakeTranslatorTestCase):
+
+    def test_translates_a_group_at_a_time(self):
+        entries = Parser(Lexer().iter_tokens(BASIC)).parse()
+        with mock.patch('src.executor.STREAM_BATCH_LINES', 1):
+            translated = Executor().iter_translated(iter(entries), 'korean', out=io.StringIO())
+            first = next(translated)
+            self.assertEqual(first.text, ['HELLO, WORLD!'])
+            self.assertEqual(FakeGoogleTranslator.requests, ['Hello, world!'])  # second not sent yet
+
+            self.assertEqual([entry.text for entry in translated], [['THIS IS A TEST.']])
+
+
+if __name__ == '__main__':
+    unittest.main()
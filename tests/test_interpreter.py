@@ -0,0 +1,163 @@
+"""Tests for reading, streaming and caching SRT files (src/interpreter.py)"""
+
+import io
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.interpreter import SRTInterpreter
+from tests.fake_translator import FakeTranslatorTestCase
+
+
+BASIC = "1\n00:00:01,000 --> 00:00:03,000\nHello, world!\n\n2\n00:00:04,000 --> 00:00:06,000\nThis is a test.\n"
+
+BASIC_OUTPUT = (
+    '[00:00:01.000] DISPLAY: "Hello, world!"\n'
+    '[00:00:03.000] CLEAR\n'
+    '[00:00:04.000] DISPLAY: "This is a test."\n'
+    '[00:00:06.000] CLEAR\n'
+)
+
+
+class InterpreterTestCase(FakeTranslatorTestCase):
+    """Gives each test a folder to write SRT files into"""
+
+    def setUp(self):
+        super().setUp()
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def write_file(self, content, name='test.srt'):
+        """Write bytes or text to a file in the test folder and give back its path"""
+        path = os.path.join(self.folder, name)
+        with open(path, 'wb') as f:
+            f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+        return path
+
+    def stream(self, path, language='english'):
+        """Run stream() on a file and give back what it printed"""
+        out = io.StringIO()
+        SRTInterpreter(verbose=False).stream(path, language, out=out)
+        return out.getvalue()
+
+
+class StreamTest(InterpreterTestCase):
+
+    def test_shows_subtitles(self):
+        self.assertEqual(self.stream(self.write_file(BASIC)), BASIC_OUTPUT)
+
+    def test_matches_run(self):
+        path = self.write_file(BASIC)
+        out = io.StringIO()
+        SRTInterpreter(verbose=False).run(path, out=out)
+        self.assertEqual(out.getvalue(), self.stream(path))
+
+    def test_bad_first_timestamp(self):
+        path = self.write_file("1\n00:00:01,000 --> 00:00:0x,000\nHello\n")
+        self.assertEqual(self.stream(path), "Lexer Error: Line 2: Bad end time '00:00:0x,000'\n")
+
+    def test_not_utf8(self):
+        path = self.write_file(b'\xff\xfe1\n')
+        self.assertTrue(self.stream(path).startswith("Error reading file:"))
+
+    def test_parser_error_after_some_subtitles(self):
+        path = self.write_file(BASIC + "\n5\n00:00:07,000 --> 00:00:08,000\nSkipped a number\n")
+        output = self.stream(path)
+        self.assertTrue(output.startswith(BASIC_OUTPUT))
+        self.assertIn("Parser Error:", output)
+
+    def test_translates(self):
+        output = self.stream(self.write_file(BASIC), 'korean')
+        self.assertIn('DISPLAY: "HELLO, WORLD!"', output)
+        self.assertIn('DISPLAY: "THIS IS A TEST."', output)
+
+    def test_bad_first_timestamp_when_translating(self):
+        path = self.write_file("1\n00:00:01,000 --> 00:00:0x,000\nHello\n")
+        self.assertTrue(self.stream(path, 'korean').startswith("Lexer Error:"))
+
+    def test_empty_file(self):
+        self.assertTrue(self.stream(self.write_file('')).startswith("Parser Error:"))
+
+    def test_missing_file(self):
+        path = os.path.join(self.folder, 'nope.srt')
+        self.assertEqual(self.stream(path), f"Error: File not found - {path}\n")
+
+
+class ParseCacheTest(InterpreterTestCase):
+
+    def run_quietly(self, interpreter, path):
+        out = io.StringIO()
+        interpreter.run(path, out=out)
+        return out.getvalue()
+
+    def test_reused(self):
+        path = self.write_file(BASIC)
+        interpreter = SRTInterpreter(verbose=False)
+        self.run_quietly(interpreter, path)
+        self.assertEqual(self.run_quietly(interpreter, path), BASIC_OUTPUT)
+        self.assertEqual(len(interpreter.parse_cache), 1)
+        self.assertEqual(interpreter.parse_cache_entries, 2)
+
+    def test_sees_changes(self):
+        path = self.write_file(BASIC)
+        interpreter = SRTInterpreter(verbose=False)
+        self.run_quietly(interpreter, path)
+
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("\n3\n00:00:07,000 --> 00:00:08,000\nNew line\n")
+        self.assertIn('DISPLAY: "New line"', self.run_quietly(interpreter, path))
+
+    def test_least_recently_used_forgotten(self):
+        first = self.write_file(BASIC, 'first.srt')
+        second = self.write_file(BASIC, 'second.srt')
+        third = self.write_file(BASIC, 'third.srt')
+        interpreter = SRTInterpreter(verbose=False)
+
+        # Room for two files of two subtitles each
+        with mock.patch('src.interpreter.PARSE_CACHE_ENTRIES', 4):
+            self.run_quietly(interpreter, first)
+            self.run_quietly(interpreter, second)
+            self.run_quietly(interpreter, first)  # first is now the most recently used
+            self.run_quietly(interpreter, third)
+
+        paths = [key[0] for key in interpreter.parse_cache]
+        self.assertEqual(paths, [os.path.abspath(first), os.path.abspath(third)])
+        self.assertEqual(interpreter.parse_cache_entries, 4)
+
+    def test_too_big_not_kept(self):
+        interpreter = SRTInterpreter(verbose=False)
+        with mock.patch('src.interpreter.PARSE_CACHE_ENTRIES', 1):
+            self.run_quietly(interpreter, self.write_file(BASIC))
+        self.assertEqual(len(interpreter.parse_cache), 0)
+
+
+class QuietTest(FakeTranslatorTestCase):
+
+    def test_translation_lines_hidden(self):
+        out = io.StringIO()
+        SRTInterpreter(verbose=False).interpret_string(BASIC, 'korean', out=out)
+        expected = BASIC_OUTPUT.replace('Hello, world!', 'HELLO, WORLD!').replace('This is a test.', 'THIS IS A TEST.')
+        self.assertEqual(out.getvalue(), expected)
+
+    def test_translation_lines_shown(self):
+        out = io.StringIO()
+        SRTInterpreter().interpret_string(BASIC, 'korean', out=out)
+        self.assertIn("Translating to korean...", out.getvalue())
+        self.assertIn("Translation complete!", out.getvalue())
+
+
+class PassthroughTest(FakeTranslatorTestCase):
+
+    def test_own_patterns_reach_translator(self):
+        out = io.StringIO()
+        interpreter = SRTInterpreter(verbose=False, passthrough_patterns=(re.compile(r'Hello.*'),))
+        interpreter.interpret_string(BASIC, 'korean', out=out)
+        self.assertIn('DISPLAY: "Hello, world!"', out.getvalue())
+        self.assertIn('DISPLAY: "THIS IS A TEST."', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
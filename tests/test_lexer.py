@@ -0,0 +1,43 @@
+"""Tests for splitting SRT text into tokens (src/lexer.py)"""
+
+import io
+import unittest
+
+from src.ast import TOKEN_TEXT, TOKEN_BLANK_LINE, TOKEN_EOF
+from src.lexer import Lexer
+
+
+class LineBreakTest(unittest.TestCase):
+
+    def test_only_real_line_breaks_split(self):
+        # Characters like \f and \u2028 are part of the text, not line breaks
+        for text in ["a\fb\n", "a\u2028b\n"]:
+            tokens = Lexer().tokenize(text)
+            self.assertEqual(tokens[0].type, TOKEN_TEXT)
+            self.assertEqual(tokens[0].value, text[:-1])
+
+    def test_break_at_end_adds_empty_line(self):
+        types = [token.type for token in Lexer().tokenize("a\r\n")]
+        self.assertEqual(types, [TOKEN_TEXT, TOKEN_BLANK_LINE, TOKEN_EOF])
+
+        # ...but other characters at the end don't
+        types = [token.type for token in Lexer().tokenize("a\x85")]
+        self.assertEqual(types, [TOKEN_TEXT, TOKEN_EOF])
+
+    def test_stream_matches_text(self):
+        text = "1\r\n00:00:01,000 --> 00:00:02,000\r\nHi\fthere\r\n"
+        from_text = [(t.type, t.value) for t in Lexer().tokenize(text)]
+        from_file = [(t.type, t.value) for t in Lexer().tokenize_stream(io.StringIO(text, newline=''))]
+        self.assertEqual(from_text, from_file)
+
+
+class TokenTypeTest(unittest.TestCase):
+
+    def test_prints_as_name(self):
+        # The notebook prints token.type and expects names, not numbers
+        token = Lexer().tokenize("Hello\n")[0]
+        self.assertEqual(f"{token.type}", "TEXT")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Tests for packing, splitting and caching translations (src/translator.py)"""
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.translation_cache import TranslationCache
+from src.translator import Translator, SEPARATOR, translation_cache
+from tests.fake_translator import FakeGoogleTranslator, FakeTranslatorTestCase
+
+
+def fail(text):
+    """A reply that always fails, like Google refusing the request"""
+    raise RuntimeError("too many requests")
+
+
+class SplitReplyTest(FakeTranslatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.translator = Translator('korean')
+
+    def test_all_separators_kept(self):
+        reply = self.translator.join_chunk(['A', 'B', 'C'])
+        self.assertEqual(self.translator.split_reply(reply, 3), {0: 'A', 1: 'B', 2: 'C'})
+
+    def test_spaces_moved_around_separator(self):
+        reply = "A <<< SRT_SEP_1 >>> B<<<SRT_SEP_2>>>\nC"
+        self.assertEqual(self.translator.split_reply(reply, 3), {0: 'A', 1: 'B', 2: 'C'})
+
+    def test_lost_separator(self):
+        # Separator 1 is gone, so text 0 swallowed text 1: neither can be trusted
+        reply = 'A B' + SEPARATOR.format(2) + 'C'
+        self.assertEqual(self.translator.split_reply(reply, 3), {2: 'C'})
+
+    def test_lost_last_separator(self):
+        reply = 'A' + SEPARATOR.format(1) + 'B C'
+        self.assertEqual(self.translator.split_reply(reply, 3), {0: 'A'})
+
+    def test_duplicated_separator(self):
+        # Separator 1 appears twice: the first text 1 is followed by 1 again, not 2
+        reply = 'A' + SEPARATOR.format(1) + 'B' + SEPARATOR.format(1) + 'X' + SEPARATOR.format(2) + 'C'
+        self.assertEqual(self.translator.split_reply(reply, 3), {0: 'A', 2: 'C'})
+
+    def test_empty_part(self):
+        reply = 'A' + SEPARATOR.format(1) + '  ' + SEPARATOR.format(2) + 'C'
+        self.assertEqual(self.translator.split_reply(reply, 3), {0: 'A', 2: 'C'})
+
+    def test_empty_part_translated_again_and_not_cached(self):
+        # The packed reply loses text 1, and so does its own request
+        FakeGoogleTranslator.reply = staticmethod(
+            lambda text: 'A' + SEPARATOR.format(1) + SEPARATOR.format(2) + 'C' if SEPARATOR.format(1) in text else ' '
+        )
+        out = io.StringIO()
+        self.assertEqual(self.translator.translate_batch(['a', 'b', 'c'], out=out), ['A', 'b', 'C'])
+        self.assertEqual(FakeGoogleTranslator.requests[1:], ['b'])
+        self.assertIsNone(self.translator.cache_lookup('b'))
+
+    def test_empty_saved_translation_ignored(self):
+        # An empty translation saved by an older version is asked for again
+        folder = tempfile.mkdtemp()
+        disk_cache = TranslationCache(os.path.join(folder, 'cache.db'))
+        self.addCleanup(shutil.rmtree, folder)
+        self.addCleanup(disk_cache.close)
+        disk_cache.put('ko', 'hello', '')
+
+        translator = Translator('korean', disk_cache=disk_cache)
+        self.assertEqual(translator.translate_batch(['hello']), ['HELLO'])
+        self.assertEqual(disk_cache.get('ko', 'hello'), 'HELLO')
+
+    def test_lost_separator_falls_back_to_single_requests(self):
+        FakeGoogleTranslator.reply = staticmethod(
+            lambda text: text.upper().replace(SEPARATOR.format(1), ' ')
+        )
+        self.assertEqual(self.translator.translate_chunk(['a', 'b', 'c']), ['A', 'B', 'C'])
+        # One packed request, then one each for the two texts that were lost
+        self.assertEqual(FakeGoogleTranslator.requests[1:], ['a', 'b'])
+
+
+class TranslateBatchTest(FakeTranslatorTestCase):
+
+    def test_translates_in_order(self):
+        texts = ['hello', 'world', 'again']
+        self.assertEqual(Translator('korean').translate_batch(texts), ['HELLO', 'WORLD', 'AGAIN'])
+        self.assertEqual(len(FakeGoogleTranslator.requests), 1)  # all packed together
+
+    def test_repeated_text_sent_once(self):
+        results = Translator('korean', chunk_size=1).translate_batch(['yes', ' yes ', 'yes'])
+        self.assertEqual(results, ['YES', ' YES ', 'YES'])
+        self.assertEqual(FakeGoogleTranslator.requests, ['yes'])
+
+    def test_outer_spaces_kept(self):
+        texts = ['  indented', 'trailing  ', '\ttab ']
+        results = Translator('korean').translate_batch(texts)
+        self.assertEqual(results, ['  INDENTED', 'TRAILING  ', '\tTAB '])
+
+        # Cached translations get their spaces back too
+        self.assertEqual(Translator('korean').translate_batch(['  trailing']), ['  TRAILING'])
+
+    def test_nothing_to_translate_not_sent(self):
+        texts = ['...', '♪ ♪', '[DOOR SLAMS!]', "(MAN'S VOICE)", '[GUNSHOT 2]']
+        self.assertEqual(Translator('korean').translate_batch(texts), texts)
+        self.assertEqual(FakeGoogleTranslator.requests, [])
+
+
+class MemoryCacheTest(FakeTranslatorTestCase):
+
+    def test_shared_between_threads(self):
+        errors = []
+
+        def use_cache(translator):
+            try:
+                for i in range(2000):
+                    text = f"line {i % 7}"
+                    translator.remember(text, text.upper())
+                    translator.cache_lookup(text)
+            except Exception as e:
+                errors.append(e)
+
+        # A tiny cache, so lines are dropped while other threads use them
+        with mock.patch('src.translator.CACHE_SIZE', 3):
+            threads = [threading.Thread(target=use_cache, args=(Translator('korean'),)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(translation_cache), 3)
+
+
+class FailureTest(FakeTranslatorTestCase):
+
+    def test_keeps_original_and_warns_once(self):
+        FakeGoogleTranslator.reply = staticmethod(fail)
+        out = io.StringIO()
+        texts = [' one', 'two', 'three']
+        self.assertEqual(Translator('korean').translate_batch(texts, out=out), texts)
+
+        warnings = out.getvalue().strip().splitlines()
+        self.assertEqual(warnings, [
+            "Warning: Could not translate 3 line(s), keeping original (RuntimeError: too many requests)"
+        ])
+
+    def test_failed_chunk_not_resent_line_by_line(self):
+        FakeGoogleTranslator.reply = staticmethod(fail)
+        texts = ['one', 'two', 'three', 'four']
+        Translator('korean', chunk_size=2).translate_batch(texts, out=io.StringIO())
+        self.assertEqual(len(FakeGoogleTranslator.requests), 2)  # one per chunk, no retries
+
+    def test_not_cached(self):
+        FakeGoogleTranslator.reply = staticmethod(fail)
+        Translator('korean').translate_batch(['hello'], out=io.StringIO())
+
+        FakeGoogleTranslator.reply = staticmethod(str.upper)
+        self.assertEqual(Translator('korean').translate_batch(['hello']), ['HELLO'])
+
+
+if __name__ == '__main__':
+    unittest.main()